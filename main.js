@@ -6,6 +6,45 @@ const os = require('os');
 
 let mainWindow;
 
+// Background whole-file pre-analysis (see python/preanalyze.py)
+let preanalysisProcess = null;
+let foregroundJobs = 0;
+
+// Live chord following (see python/stream_analyze.py)
+let liveAnalysisProcess = null;
+
+// Batch audio extraction (see python/ingest_audio.py)
+let ingestProcess = null;
+
+// Pause background pre-analysis while a foreground request is running
+function pausePreanalysis() {
+  foregroundJobs++;
+  if (preanalysisProcess && foregroundJobs === 1 && process.platform !== 'win32') {
+    preanalysisProcess.kill('SIGSTOP');
+  }
+}
+
+// Resume background pre-analysis once no foreground requests remain
+function resumePreanalysis() {
+  foregroundJobs = Math.max(0, foregroundJobs - 1);
+  if (preanalysisProcess && foregroundJobs === 0 && process.platform !== 'win32') {
+    preanalysisProcess.kill('SIGCONT');
+  }
+}
+
+// Stop any running background pre-analysis
+function cancelPreanalysis() {
+  if (preanalysisProcess) {
+    const proc = preanalysisProcess;
+    preanalysisProcess = null;
+    // A stopped process must be continued before it can handle SIGTERM
+    if (process.platform !== 'win32') {
+      proc.kill('SIGCONT');
+    }
+    proc.kill();
+  }
+}
+
 // Get the Python executable path (uses virtual environment if available)
 function getPythonPath() {
   const venvPython = path.join(__dirname, 'python', 'venv', 'bin', 'python3');
@@ -47,6 +86,17 @@ app.whenReady().then(() => {
   });
 });
 
+// Don't leave background Python processes running after the app exits
+app.on('will-quit', () => {
+  cancelPreanalysis();
+  if (liveAnalysisProcess) {
+    liveAnalysisProcess.kill('SIGTERM');
+  }
+  if (ingestProcess) {
+    ingestProcess.kill('SIGTERM');
+  }
+});
+
 app.on('window-all-closed', () => {
   if (process.platform !== 'darwin') {
     app.quit();
@@ -70,6 +120,23 @@ ipcMain.handle('open-file-dialog', async () => {
   return null;
 });
 
+// Open dialog for importing folders and/or multiple files
+ipcMain.handle('open-import-dialog', async () => {
+  const result = await dialog.showOpenDialog(mainWindow, {
+    title: 'Import Recordings',
+    buttonLabel: 'Import',
+    properties: ['openDirectory', 'openFile', 'multiSelections'],
+    filters: [
+      { name: 'Audio/Video', extensions: ['mp3', 'wav', 'm4a', 'flac', 'ogg', 'mp4', 'mov', 'avi', 'mkv', 'webm', 'm4v'] }
+    ]
+  });
+
+  if (!result.canceled && result.filePaths.length > 0) {
+    return result.filePaths;
+  }
+  return null;
+});
+
 // Extract audio from video file
 ipcMain.handle('extract-audio', async (event, filePath) => {
   return new Promise((resolve, reject) => {
@@ -113,6 +180,7 @@ ipcMain.handle('extract-audio', async (event, filePath) => {
 
 // Analyze audio segment for chords and key
 ipcMain.handle('analyze-audio', async (event, audioPath, startTime, endTime, beatsPerMeasure = 4, beatsToGroup = 4) => {
+  pausePreanalysis();
   return new Promise((resolve, reject) => {
     const pythonScript = path.join(__dirname, 'python', 'analyze.py');
     const pythonPath = getPythonPath();
@@ -153,9 +221,77 @@ ipcMain.handle('analyze-audio', async (event, audioPath, startTime, endTime, bea
     process.on('error', (err) => {
       reject(err);
     });
+  }).finally(resumePreanalysis);
+});
+
+// Precompute whole-file features in the background so segment analysis is instant
+ipcMain.handle('start-preanalysis', async (event, audioPath) => {
+  cancelPreanalysis();
+
+  return new Promise((resolve) => {
+    const pythonScript = path.join(__dirname, 'python', 'preanalyze.py');
+    const pythonPath = getPythonPath();
+
+    const process = spawn(pythonPath, [pythonScript, audioPath]);
+    preanalysisProcess = process;
+
+    // Lowest scheduling priority; the script also lowers its own niceness
+    try {
+      os.setPriority(process.pid, 19);
+    } catch (e) {
+      // Not fatal - the job just competes more with foreground work
+    }
+
+    // A foreground request may already be running
+    if (foregroundJobs > 0 && global.process.platform !== 'win32') {
+      process.kill('SIGSTOP');
+    }
+
+    let stdout = '';
+    let stderr = '';
+
+    process.stdout.on('data', (data) => {
+      stdout += data.toString();
+    });
+
+    process.stderr.on('data', (data) => {
+      stderr += data.toString();
+    });
+
+    process.on('close', (code) => {
+      const cancelled = preanalysisProcess !== process;
+      if (!cancelled) {
+        preanalysisProcess = null;
+      }
+
+      // Pre-analysis is best-effort, so failures resolve rather than reject
+      if (cancelled) {
+        resolve({ success: false, cancelled: true });
+      } else if (code === 0) {
+        try {
+          resolve(JSON.parse(stdout));
+        } catch (e) {
+          resolve({ success: false, error: `Failed to parse pre-analysis result: ${e.message}` });
+        }
+      } else {
+        resolve({ success: false, error: stderr || `Pre-analysis failed with code ${code}` });
+      }
+    });
+
+    process.on('error', (err) => {
+      if (preanalysisProcess === process) {
+        preanalysisProcess = null;
+      }
+      resolve({ success: false, error: err.message });
+    });
   });
 });
 
+// Cancel background pre-analysis (e.g. when the file is closed)
+ipcMain.handle('cancel-preanalysis', async () => {
+  cancelPreanalysis();
+});
+
 // Check if file is video type
 ipcMain.handle('is-video-file', async (event, filePath) => {
   const videoExtensions = ['.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v'];
@@ -258,3 +394,144 @@ ipcMain.handle('download-youtube', async (event, url) => {
     });
   });
 });
+
+// Start following chords and key live from the microphone
+// Each update is sent to the renderer as a 'live-analysis-update' event
+ipcMain.handle('start-live-analysis', async (event, source = 'mic') => {
+  if (liveAnalysisProcess) {
+    throw new Error('Live analysis is already running');
+  }
+
+  return new Promise((resolve, reject) => {
+    const pythonScript = path.join(__dirname, 'python', 'stream_analyze.py');
+    const pythonPath = getPythonPath();
+
+    const process = spawn(pythonPath, [pythonScript, source]);
+    liveAnalysisProcess = process;
+
+    let buffered = '';
+    let summary = null;
+    let stderr = '';
+
+    process.stdout.on('data', (data) => {
+      buffered += data.toString();
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        try {
+          const update = JSON.parse(line);
+          if (update.type === 'summary') {
+            summary = update;
+          } else if (mainWindow) {
+            mainWindow.webContents.send('live-analysis-update', update);
+          }
+        } catch (e) {
+          console.log('Unparseable live analysis output:', line);
+        }
+      }
+    });
+
+    process.stderr.on('data', (data) => {
+      stderr += data.toString();
+    });
+
+    process.on('close', (code) => {
+      liveAnalysisProcess = null;
+      if (summary && summary.success) {
+        resolve(summary);
+      } else if (summary) {
+        reject(new Error(summary.error || 'Live analysis failed'));
+      } else {
+        reject(new Error(stderr || `Live analysis exited with code ${code}`));
+      }
+    });
+
+    process.on('error', (err) => {
+      liveAnalysisProcess = null;
+      reject(err);
+    });
+  });
+});
+
+// Stop live analysis; the start-live-analysis promise resolves with latency statistics
+ipcMain.handle('stop-live-analysis', async () => {
+  if (liveAnalysisProcess) {
+    liveAnalysisProcess.kill('SIGTERM');
+  }
+});
+
+// Extract audio from many files and folders concurrently
+// Per-file events are sent to the renderer as 'ingest-progress' events
+ipcMain.handle('ingest-files', async (event, inputPaths, workers = null) => {
+  if (ingestProcess) {
+    throw new Error('An import is already running');
+  }
+
+  return new Promise((resolve, reject) => {
+    const pythonScript = path.join(__dirname, 'python', 'ingest_audio.py');
+    const pythonPath = getPythonPath();
+    const outputDir = path.join(os.tmpdir(), 'harmony_ingest');
+
+    const args = [pythonScript, outputDir, ...inputPaths];
+    if (workers) {
+      args.push('--workers', workers.toString());
+    }
+
+    const process = spawn(pythonPath, args);
+    ingestProcess = process;
+
+    let buffered = '';
+    let summary = null;
+    let stderr = '';
+
+    process.stdout.on('data', (data) => {
+      buffered += data.toString();
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        try {
+          const update = JSON.parse(line);
+          if (update.type === 'summary') {
+            summary = update;
+          } else if (mainWindow) {
+            mainWindow.webContents.send('ingest-progress', update);
+          }
+        } catch (e) {
+          console.log('Unparseable ingest output:', line);
+        }
+      }
+    });
+
+    process.stderr.on('data', (data) => {
+      stderr += data.toString();
+    });
+
+    process.on('close', (code) => {
+      ingestProcess = null;
+      // Partial failures still resolve so the renderer can show per-file results
+      if (summary && summary.results) {
+        resolve(summary);
+      } else if (summary) {
+        reject(new Error(summary.error || 'Import failed'));
+      } else {
+        reject(new Error(stderr || `Import failed with code ${code}`));
+      }
+    });
+
+    process.on('error', (err) => {
+      ingestProcess = null;
+      reject(err);
+    });
+  });
+});
+
+// Cancel a running import; partial outputs are removed
+ipcMain.handle('cancel-ingest', async () => {
+  if (ingestProcess) {
+    ingestProcess.kill('SIGTERM');
+  }
+});
@@ -5,6 +5,9 @@ contextBridge.exposeInMainWorld('electronAPI', {
   // Open file dialog and return selected file path
   openFileDialog: () => ipcRenderer.invoke('open-file-dialog'),
 
+  // Open a dialog for picking folders and/or files to import, returns array of paths or null
+  openImportDialog: () => ipcRenderer.invoke('open-import-dialog'),
+
   // Extract audio from video file, returns { success, audioPath } or error
   extractAudio: (filePath) => ipcRenderer.invoke('extract-audio', filePath),
 
@@ -25,5 +28,42 @@ contextBridge.exposeInMainWorld('electronAPI', {
 
   // Generate waveform peaks from audio file (server-side to avoid browser crashes)
   // Returns { success, peaks: [...], duration } or error
-  generatePeaks: (audioPath) => ipcRenderer.invoke('generate-peaks', audioPath)
+  generatePeaks: (audioPath) => ipcRenderer.invoke('generate-peaks', audioPath),
+
+  // Precompute whole-file features in the background so segment analysis is instant
+  // Returns { success, keyTimeline: [...], tempo, duration } or { success: false, ... }
+  startPreanalysis: (audioPath) => ipcRenderer.invoke('start-preanalysis', audioPath),
+
+  // Stop any running background pre-analysis
+  cancelPreanalysis: () => ipcRenderer.invoke('cancel-preanalysis'),
+
+  // Follow chords and key live from the microphone until stopLiveAnalysis is called
+  // Resolves with { success, latencyMs: { mean, p95, max }, droppedFraction, gaps, ... } when stopped
+  startLiveAnalysis: () => ipcRenderer.invoke('start-live-analysis'),
+
+  // Stop live analysis
+  stopLiveAnalysis: () => ipcRenderer.invoke('stop-live-analysis'),
+
+  // Subscribe to live updates: { type: 'chord' | 'key', time, chord | key, latencyMs }
+  // Returns a function that removes the subscription
+  onLiveAnalysisUpdate: (callback) => {
+    const listener = (event, update) => callback(update);
+    ipcRenderer.on('live-analysis-update', listener);
+    return () => ipcRenderer.removeListener('live-analysis-update', listener);
+  },
+
+  // Extract audio from many files/folders concurrently
+  // Resolves with { success, results: [{ input, audioPath, status }], filesPerMinute, mbPerSecond, ... }
+  ingestFiles: (inputPaths, workers = null) => ipcRenderer.invoke('ingest-files', inputPaths, workers),
+
+  // Cancel a running import
+  cancelIngest: () => ipcRenderer.invoke('cancel-ingest'),
+
+  // Subscribe to import events: { type: 'start' | 'progress' | 'done' | 'skipped' | 'error' | 'cancelled', input, ... }
+  // Returns a function that removes the subscription
+  onIngestProgress: (callback) => {
+    const listener = (event, update) => callback(update);
+    ipcRenderer.on('ingest-progress', listener);
+    return () => ipcRenderer.removeListener('ingest-progress', listener);
+  }
 });
@@ -7,6 +7,7 @@ Uses madmom for chord recognition and librosa for key detection.
 import sys
 import json
 import os
+import importlib.util
 import warnings
 
 # Suppress warnings for cleaner output
@@ -15,6 +16,38 @@ warnings.filterwarnings('ignore')
 import numpy as np
 import librosa
 
+# Sample rate and chroma hop length shared with preanalyze.py
+ANALYSIS_SR = 44100
+HOP_LENGTH = 512
+
+# Chord templates (major and minor triads)
+CHORD_TEMPLATES = {
+    'C': [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0],
+    'C#': [0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0],
+    'D': [0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 0],
+    'D#': [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0],
+    'E': [0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1],
+    'F': [1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0],
+    'F#': [0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0],
+    'G': [0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1],
+    'G#': [1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
+    'A': [0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0],
+    'A#': [0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0],
+    'B': [0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1],
+    'Cm': [1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0],
+    'C#m': [0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
+    'Dm': [0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0],
+    'D#m': [0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0],
+    'Em': [0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1],
+    'Fm': [1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0],
+    'F#m': [0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0],
+    'Gm': [0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0],
+    'G#m': [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1],
+    'Am': [1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0],
+    'A#m': [0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0],
+    'Bm': [0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
+}
+
 
 def detect_key(y: np.ndarray, sr: int) -> tuple:
     """
@@ -30,6 +63,19 @@ def detect_key(y: np.ndarray, sr: int) -> tuple:
     # Compute chroma features
     chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
 
+    return key_from_chroma(chroma)
+
+
+def key_from_chroma(chroma: np.ndarray) -> tuple:
+    """
+    Detect the musical key from precomputed chroma features.
+
+    Args:
+        chroma: Chroma features (12 x frames)
+
+    Returns:
+        tuple of (key_name, confidence)
+    """
     # Average chroma over time
     chroma_avg = np.mean(chroma, axis=1)
 
@@ -66,6 +112,37 @@ def detect_key(y: np.ndarray, sr: int) -> tuple:
     return best_key, confidence
 
 
+def madmom_available() -> bool:
+    """Check whether madmom is installed (it needs raw audio, so cached features can't serve it)."""
+    return importlib.util.find_spec('madmom') is not None
+
+
+def match_chord(chroma_vector: np.ndarray) -> tuple:
+    """
+    Find the chord template that best matches a single chroma vector.
+
+    Args:
+        chroma_vector: 12-element chroma vector
+
+    Returns:
+        tuple of (chord_name, score) where score is the cosine similarity
+    """
+    chroma_norm = chroma_vector / (np.linalg.norm(chroma_vector) + 1e-10)
+
+    best_chord = None
+    best_score = -1
+
+    for name, template in CHORD_TEMPLATES.items():
+        template = np.array(template)
+        template_norm = template / (np.linalg.norm(template) + 1e-10)
+        score = np.dot(chroma_norm, template_norm)
+        if score > best_score:
+            best_score = score
+            best_chord = name
+
+    return best_chord, best_score
+
+
 def detect_chords_madmom(y: np.ndarray, sr: int, segment_start: float, beats_per_measure: int = 4, beats_to_group: int = 4) -> list:
     """
     Detect chords using madmom's CNN-based chord recognition.
@@ -146,41 +223,35 @@ def detect_chords_librosa(y: np.ndarray, sr: int, segment_start: float, beats_pe
     Returns:
         List of chord dictionaries (one per beat group)
     """
-    # Chord templates (major and minor triads)
-    chord_templates = {
-        'C': [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0],
-        'C#': [0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0],
-        'D': [0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 0],
-        'D#': [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0],
-        'E': [0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1],
-        'F': [1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0],
-        'F#': [0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0],
-        'G': [0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1],
-        'G#': [1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
-        'A': [0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0],
-        'A#': [0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-        'B': [0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1],
-        'Cm': [1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0],
-        'C#m': [0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
-        'Dm': [0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0],
-        'D#m': [0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0],
-        'Em': [0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1],
-        'Fm': [1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0],
-        'F#m': [0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0],
-        'Gm': [0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0],
-        'G#m': [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1],
-        'Am': [1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0],
-        'A#m': [0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-        'Bm': [0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
-    }
-
-    # Convert templates to numpy arrays
-    templates = {name: np.array(t) for name, t in chord_templates.items()}
-
     # Detect tempo automatically
     tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-    tempo = float(tempo)
+    tempo = float(np.atleast_1d(tempo)[0])
+
+    # Compute chroma features at higher resolution for accurate analysis
+    chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=HOP_LENGTH)
+    frame_times = librosa.frames_to_time(np.arange(chroma.shape[1]), sr=sr, hop_length=HOP_LENGTH)
+
+    duration = len(y) / sr
+
+    return chords_from_chroma(chroma, frame_times, duration, tempo, segment_start, beats_per_measure, beats_to_group)
+
 
+def chords_from_chroma(chroma: np.ndarray, frame_times: np.ndarray, duration: float, tempo: float, segment_start: float, beats_per_measure: int = 4, beats_to_group: int = 4) -> list:
+    """
+    Match precomputed chroma features against chord templates, one chord per group of beats.
+
+    Args:
+        chroma: Chroma features (12 x frames)
+        frame_times: Time of each chroma frame relative to the segment start
+        duration: Segment duration in seconds
+        tempo: Detected tempo in BPM
+        segment_start: Start time of segment
+        beats_per_measure: Number of beats per measure (e.g., 4 for 4/4, 3 for 3/4, 6 for 6/8)
+        beats_to_group: Number of beats to group for each chord (controls granularity)
+
+    Returns:
+        List of chord dictionaries (one per beat group)
+    """
     # Map user's time signature to expected librosa pulse level
     # Compound meters (6/8, 9/8, 12/8) are felt in larger groupings
     if beats_per_measure == 6:  # 6/8 compound meter - felt in 2
@@ -200,15 +271,9 @@ def detect_chords_librosa(y: np.ndarray, sr: int, segment_start: float, beats_pe
     interval_duration = measure_duration * (beats_to_group / beats_per_measure)
 
     # Create fixed-interval boundaries (more reliable than grouping detected beats)
-    duration = len(y) / sr
     group_starts = list(np.arange(0, duration, interval_duration))
     group_ends = group_starts[1:] + [duration]
 
-    # Compute chroma features at higher resolution for accurate analysis
-    hop_length = 512
-    chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=hop_length)
-    frame_times = librosa.frames_to_time(np.arange(chroma.shape[1]), sr=sr, hop_length=hop_length)
-
     chords = []
 
     for group_start, group_end in zip(group_starts, group_ends):
@@ -217,20 +282,9 @@ def detect_chords_librosa(y: np.ndarray, sr: int, segment_start: float, beats_pe
         if not np.any(mask):
             continue
 
-        # Average chroma over the group
+        # Average chroma over the group and find best matching chord
         group_chroma = np.mean(chroma[:, mask], axis=1)
-        group_chroma_norm = group_chroma / (np.linalg.norm(group_chroma) + 1e-10)
-
-        # Find best matching chord
-        best_chord = None
-        best_score = -1
-
-        for name, template in templates.items():
-            template_norm = template / (np.linalg.norm(template) + 1e-10)
-            score = np.dot(group_chroma_norm, template_norm)
-            if score > best_score:
-                best_score = score
-                best_chord = name
+        best_chord, best_score = match_chord(group_chroma)
 
         # Add chord for each interval (no merging - keeps timing consistent)
         if best_score > 0.6:
@@ -243,6 +297,54 @@ def detect_chords_librosa(y: np.ndarray, sr: int, segment_start: float, beats_pe
     return chords
 
 
+def analyze_segment_features(features: dict, start_time: float, end_time: float, beats_per_measure: int = 4, beats_to_group: int = 4) -> dict:
+    """
+    Analyze a segment by slicing whole-file features precomputed by preanalyze.py.
+
+    Args:
+        features: Feature arrays returned by preanalyze.load_features
+        start_time: Start time in seconds
+        end_time: End time in seconds
+        beats_per_measure: Number of beats per measure (e.g., 4 for 4/4, 3 for 3/4, 6 for 6/8)
+        beats_to_group: Number of beats to group for each chord (controls granularity)
+
+    Returns:
+        dict with key, confidence, and chords
+    """
+    sr = int(features['sr'])
+    hop_length = int(features['hop_length'])
+    chroma = features['chroma']
+    onset_env = features['onset_env']
+
+    end_time = min(end_time, float(features['duration']))
+    start_frame = int(librosa.time_to_frames(start_time, sr=sr, hop_length=hop_length))
+    end_frame = int(librosa.time_to_frames(end_time, sr=sr, hop_length=hop_length)) + 1
+
+    segment_chroma = chroma[:, start_frame:end_frame]
+    if segment_chroma.shape[1] == 0:
+        return {
+            'error': 'Audio segment is empty'
+        }
+
+    # Frame times relative to the segment start, as if the segment were loaded alone
+    frame_times = librosa.frames_to_time(np.arange(start_frame, start_frame + segment_chroma.shape[1]), sr=sr, hop_length=hop_length) - start_time
+
+    # Re-estimate tempo over the segment; fall back to the whole-file tempo
+    tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env[start_frame:end_frame], sr=sr, hop_length=hop_length)
+    tempo = float(np.atleast_1d(tempo)[0])
+    if tempo <= 0:
+        tempo = float(features['tempo'])
+
+    key, confidence = key_from_chroma(segment_chroma)
+    chords = chords_from_chroma(segment_chroma, frame_times, end_time - start_time, tempo, start_time, beats_per_measure, beats_to_group)
+
+    return {
+        'key': key,
+        'confidence': round(confidence, 3),
+        'chords': chords
+    }
+
+
 def analyze_segment(audio_path: str, start_time: float, end_time: float, beats_per_measure: int = 4, beats_to_group: int = 4) -> dict:
     """
     Analyze an audio segment for chords and key.
@@ -263,10 +365,19 @@ def analyze_segment(audio_path: str, start_time: float, end_time: float, beats_p
         }
 
     try:
+        # Answer from precomputed whole-file features when available.
+        # madmom needs the raw audio, so only the librosa path can use them.
+        if not madmom_available():
+            from preanalyze import load_features
+
+            features = load_features(audio_path)
+            if features is not None:
+                return analyze_segment_features(features, start_time, end_time, beats_per_measure, beats_to_group)
+
         # Load audio segment
         y, sr = librosa.load(
             audio_path,
-            sr=44100,
+            sr=ANALYSIS_SR,
             offset=start_time,
             duration=end_time - start_time
         )
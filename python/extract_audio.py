@@ -8,11 +8,14 @@ import sys
 import json
 import subprocess
 import os
+import shutil
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
 def find_ffmpeg():
-    """Find FFmpeg executable path."""
+    """Find FFmpeg executable path (looked up once per process)."""
     # Common locations on macOS
     locations = [
         '/opt/homebrew/bin/ffmpeg',  # Apple Silicon Homebrew
@@ -25,14 +28,22 @@ def find_ffmpeg():
             return loc
 
     # Try PATH
-    try:
-        result = subprocess.run(['which', 'ffmpeg'], capture_output=True, text=True)
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
+    return shutil.which('ffmpeg')
+
 
-    return None
+def build_ffmpeg_command(ffmpeg_path: str, input_path: str, output_path: str) -> list:
+    """Build the FFmpeg command that extracts audio as 16-bit PCM WAV at 44.1kHz mono."""
+    return [
+        ffmpeg_path,
+        '-i', input_path,
+        '-vn',                    # No video
+        '-acodec', 'pcm_s16le',   # 16-bit PCM
+        '-ar', '44100',           # 44.1kHz sample rate
+        '-ac', '1',               # Mono
+        '-f', 'wav',              # WAV container, whatever the output extension
+        '-y',                     # Overwrite output
+        output_path
+    ]
 
 
 def extract_audio(input_path: str, output_path: str) -> dict:
@@ -60,17 +71,7 @@ def extract_audio(input_path: str, output_path: str) -> dict:
             'error': f'Input file not found: {input_path}'
         }
 
-    # FFmpeg command to extract audio as 16-bit PCM WAV at 44.1kHz mono
-    cmd = [
-        ffmpeg_path,
-        '-i', input_path,
-        '-vn',                    # No video
-        '-acodec', 'pcm_s16le',   # 16-bit PCM
-        '-ar', '44100',           # 44.1kHz sample rate
-        '-ac', '1',               # Mono
-        '-y',                     # Overwrite output
-        output_path
-    ]
+    cmd = build_ffmpeg_command(ffmpeg_path, input_path, output_path)
 
     try:
         result = subprocess.run(
@@ -98,6 +99,9 @@ def extract_audio(input_path: str, output_path: str) -> dict:
         }
 
     except subprocess.TimeoutExpired:
+        # Don't leave a truncated WAV behind
+        if os.path.isfile(output_path):
+            os.unlink(output_path)
         return {
             'success': False,
             'error': 'Audio extraction timed out'
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Extract audio from many video/audio files concurrently.
+Runs a bounded number of FFmpeg processes in parallel, prints per-file progress
+and throughput as JSON lines, and skips inputs whose output already exists
+(outputs are named by a hash of the input's content).
+"""
+
+import sys
+import json
+import os
+import hashlib
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from extract_audio import find_ffmpeg, build_ffmpeg_command
+
+MEDIA_EXTENSIONS = {
+    '.mp3', '.wav', '.m4a', '.flac', '.ogg',
+    '.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v'
+}
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+DEFAULT_TIMEOUT = 300  # Seconds per file, as in extract_audio.py
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def collect_inputs(paths: list) -> list:
+    """
+    Expand folders into the media files they contain (recursively).
+
+    Args:
+        paths: Files and/or folders
+
+    Returns:
+        Sorted list of media file paths, without duplicates
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in names:
+                    if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+                        files.add(os.path.join(root, name))
+        else:
+            files.add(path)
+    return sorted(files)
+
+
+def hash_file(path: str, cancelled: threading.Event = None):
+    """
+    Hash a file's content in chunks.
+
+    Args:
+        path: File to hash
+        cancelled: Event that aborts hashing when set
+
+    Returns:
+        Hex digest, or None if cancelled
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_ffmpeg_duration(line: str):
+    """Parse the input duration from an FFmpeg 'Duration: HH:MM:SS.xx' line."""
+    if 'Duration:' not in line:
+        return None
+    try:
+        stamp = line.split('Duration:')[1].split(',')[0].strip()
+        hours, minutes, seconds = stamp.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+class IngestQueue:
+    """
+    Bounded pool of FFmpeg extraction jobs.
+    cancel() kills running FFmpeg processes and removes their partial outputs.
+    """
+
+    def __init__(self, output_dir: str, workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT, emit=None):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.timeout = timeout
+        self.emit = emit or (lambda event: None)
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.running = set()
+        self.claimed = {}  # Content digest -> Future resolving to the first input's result
+
+    def cancel(self):
+        self.cancelled.set()
+        with self.lock:
+            for process in self.running:
+                process.kill()
+
+    def run(self, inputs: list) -> dict:
+        """
+        Extract audio from every input.
+
+        Args:
+            inputs: Paths of media files
+
+        Returns:
+            dict with per-file results and overall throughput
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self._ingest_file, inputs))
+
+        elapsed = time.monotonic() - started
+        converted = [r for r in results if r['status'] == 'done']
+        total_bytes = sum(r.get('bytes', 0) for r in converted)
+
+        return {
+            'success': all(r['status'] in ('done', 'skipped') for r in results),
+            'results': results,
+            'done': len(converted),
+            'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+            'failed': sum(1 for r in results if r['status'] == 'error'),
+            'cancelled': sum(1 for r in results if r['status'] == 'cancelled'),
+            'seconds': round(elapsed, 2),
+            'filesPerMinute': round(len(converted) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            'mbPerSecond': round(total_bytes / 1e6 / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def _ingest_file(self, input_path: str) -> dict:
+        result = {'input': input_path}
+
+        if self.cancelled.is_set():
+            result['status'] = 'cancelled'
+            self.emit({'type': 'cancelled', **result})
+            return result
+
+        job = None
+        try:
+            if not os.path.isfile(input_path):
+                raise RuntimeError(f'Input file not found: {input_path}')
+
+            digest = hash_file(input_path, self.cancelled)
+            if digest is None:
+                result['status'] = 'cancelled'
+                self.emit({'type': 'cancelled', **result})
+                return result
+
+            output_path = os.path.join(self.output_dir, f'{digest[:32]}.wav')
+            result['audioPath'] = output_path
+
+            # Identical content earlier in this batch is only converted once
+            with self.lock:
+                original = self.claimed.get(digest)
+                if original is None:
+                    job = Future()
+                    self.claimed[digest] = job
+
+            if original is not None:
+                # Wait for the first copy and share its outcome
+                first = original.result()
+                result['duplicateOf'] = first['input']
+                if first['status'] in ('done', 'skipped'):
+                    result['status'] = 'skipped'
+                else:
+                    result['status'] = first['status']
+                    if 'error' in first:
+                        result['error'] = f'Duplicate of {first["input"]}: {first["error"]}'
+            elif os.path.isfile(output_path):
+                # Already extracted in an earlier run
+                result['status'] = 'skipped'
+            else:
+                result.update(self._extract(input_path, output_path))
+
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+
+        finally:
+            if job is not None:
+                job.set_result(result)
+
+        self.emit({'type': result['status'], **result})
+        return result
+
+    def _extract(self, input_path: str, output_path: str) -> dict:
+        ffmpeg_path = find_ffmpeg()
+        if not ffmpeg_path:
+            raise RuntimeError('FFmpeg not found. Please install with: brew install ffmpeg')
+
+        # Write to a temporary name so a partial file never looks like a finished output
+        partial_path = output_path + '.part'
+        cmd = build_ffmpeg_command(ffmpeg_path, input_path, partial_path)
+        cmd[1:1] = ['-hide_banner', '-nostats', '-progress', 'pipe:1']
+
+        self.emit({'type': 'start', 'input': input_path, 'audioPath': output_path})
+        started = time.monotonic()
+
+        with self.lock:
+            if self.cancelled.is_set():
+                return {'status': 'cancelled'}
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            self.running.add(process)
+
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(self.timeout, on_timeout)
+        timer.start()
+
+        # FFmpeg logs the input duration on stderr; keep the tail for error messages
+        duration = None
+        stderr_tail = []
+
+        def read_stderr():
+            nonlocal duration
+            for line in process.stderr:
+                if duration is None:
+                    duration = parse_ffmpeg_duration(line)
+                stderr_tail.append(line)
+                del stderr_tail[:-20]
+
+        stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+        stderr_thread.start()
+
+        try:
+            # -progress writes key=value blocks, each ending with a 'progress=' line
+            position = 0.0
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                if key in ('out_time_us', 'out_time_ms') and value.isdigit():
+                    # out_time_ms is also in microseconds (older FFmpeg only has this one)
+                    position = int(value) / 1e6
+                elif key == 'progress' and duration:
+                    self.emit({
+                        'type': 'progress',
+                        'input': input_path,
+                        'percent': round(min(100.0, position / duration * 100), 1),
+                        'realtimeFactor': round(position / max(time.monotonic() - started, 1e-6), 2)
+                    })
+
+            process.wait()
+            stderr_thread.join()
+        finally:
+            timer.cancel()
+            # If reading progress failed (e.g. emit hit a closed pipe), FFmpeg is still
+            # running; stop it before dropping it from self.running so it can't be orphaned
+            if process.returncode is None:
+                process.kill()
+                process.wait()
+            with self.lock:
+                self.running.discard(process)
+            if process.returncode != 0 and os.path.isfile(partial_path):
+                os.unlink(partial_path)
+
+        if timed_out.is_set():
+            raise RuntimeError('Audio extraction timed out')
+        if self.cancelled.is_set() and process.returncode != 0:
+            return {'status': 'cancelled'}
+        if process.returncode != 0:
+            raise RuntimeError(f'FFmpeg error: {"".join(stderr_tail)}')
+        if not os.path.isfile(partial_path):
+            raise RuntimeError('Output file was not created')
+
+        os.replace(partial_path, output_path)
+
+        elapsed = time.monotonic() - started
+        size = os.path.getsize(input_path)
+        return {
+            'status': 'done',
+            'bytes': size,
+            'seconds': round(elapsed, 2),
+            'mbPerSecond': round(size / 1e6 / elapsed, 2) if elapsed > 0 else 0.0,
+            'realtimeFactor': round(duration / elapsed, 2) if duration and elapsed > 0 else None
+        }
+
+
+def ingest_audio(inputs: list, output_dir: str, workers: int = DEFAULT_WORKERS, emit=None) -> dict:
+    """
+    Extract audio from many files and folders concurrently.
+
+    Args:
+        inputs: Media files and/or folders containing them
+        output_dir: Directory for output WAV files
+        workers: Maximum number of FFmpeg processes running at once
+        emit: Callback receiving each progress event
+
+    Returns:
+        dict with per-file results and overall throughput
+    """
+    files = collect_inputs(inputs)
+    if not files:
+        return {
+            'success': False,
+            'error': 'No audio or video files found'
+        }
+
+    queue = IngestQueue(output_dir, workers, emit=emit)
+
+    # Kill running FFmpeg processes and clean up partial outputs when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: queue.cancel())
+
+    try:
+        return queue.run(files)
+    except KeyboardInterrupt:
+        queue.cancel()
+        raise
+
+
+USAGE = 'Usage: ingest_audio.py <output_dir> <input_path_or_folder>... [--workers N]'
+
+
+def main():
+    args = sys.argv[1:]
+    workers = DEFAULT_WORKERS
+    if '--workers' in args:
+        index = args.index('--workers')
+        try:
+            workers = max(1, int(args[index + 1]))
+        except (IndexError, ValueError):
+            args = []  # Fall through to the usage error
+        else:
+            del args[index:index + 2]
+
+    if len(args) < 2:
+        print(json.dumps({
+            'type': 'summary',
+            'success': False,
+            'error': USAGE
+        }))
+        sys.exit(1)
+
+    output_dir = args[0]
+    inputs = args[1:]
+
+    emit_lock = threading.Lock()
+
+    def emit(event):
+        with emit_lock:
+            print(json.dumps(event), flush=True)
+
+    result = ingest_audio(inputs, output_dir, workers, emit)
+    print(json.dumps({'type': 'summary', **result}), flush=True)
+
+    sys.exit(0 if result['success'] else 1)
+
+
+if __name__ == '__main__':
+    main()
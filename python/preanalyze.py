@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Whole-file pre-analysis for instant segment analysis.
+Computes frame-level chroma, onset strength, beats and a key timeline for an
+entire audio file and caches them, so analyze.py can answer segment requests
+by slicing precomputed features instead of re-running the pipeline.
+Meant to run as a low-priority background job right after a file is loaded.
+"""
+
+import sys
+import json
+import os
+import hashlib
+import signal
+import tempfile
+import time
+import warnings
+
+# Suppress warnings for cleaner output
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import librosa
+
+from analyze import key_from_chroma, madmom_available, ANALYSIS_SR, HOP_LENGTH
+
+# Bump when the cached feature layout changes so stale caches are ignored
+FEATURES_VERSION = 1
+
+# Key timeline window length in seconds
+KEY_WINDOW = 10.0
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'harmony_features')
+
+# Cache limits; least recently used entries are evicted first
+CACHE_MAX_BYTES = 500 * 1024 * 1024
+CACHE_MAX_AGE = 7 * 24 * 3600       # Seconds
+PARTIAL_MAX_AGE = 3600              # Seconds before an unfinished temp file counts as abandoned
+
+
+def feature_cache_path(audio_path: str) -> str:
+    """
+    Get the cache file path for an audio file's precomputed features.
+    The name depends on the file's path, size and modification time, so an
+    edited or replaced file never matches an old cache entry.
+
+    Args:
+        audio_path: Path to audio file
+
+    Returns:
+        Path of the .npz cache file (may not exist yet)
+    """
+    stat = os.stat(audio_path)
+    ident = f'{os.path.abspath(audio_path)}|{stat.st_size}|{stat.st_mtime_ns}|{FEATURES_VERSION}'
+    digest = hashlib.sha1(ident.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f'{digest}.npz')
+
+
+def load_features(audio_path: str):
+    """
+    Load precomputed features for an audio file, if available.
+
+    Args:
+        audio_path: Path to audio file
+
+    Returns:
+        dict of feature arrays, or None if no valid cache exists
+    """
+    try:
+        cache_path = feature_cache_path(audio_path)
+        if not os.path.isfile(cache_path):
+            return None
+
+        with np.load(cache_path, allow_pickle=False) as data:
+            features = {name: data[name] for name in data.files}
+
+        if int(features['version']) != FEATURES_VERSION:
+            return None
+
+        # Mark as recently used so pruning keeps it
+        os.utime(cache_path)
+        return features
+
+    except Exception:
+        # A missing or corrupt cache just means falling back to the full pipeline
+        return None
+
+
+def prune_cache():
+    """
+    Evict old feature caches: abandoned temp files, entries unused for
+    CACHE_MAX_AGE, then least recently used entries beyond CACHE_MAX_BYTES.
+    """
+    now = time.time()
+    entries = []
+
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+            # Temp files from mkstemp start with 'tmp'; finished caches are named by digest
+            max_age = PARTIAL_MAX_AGE if name.startswith('tmp') else CACHE_MAX_AGE
+            if now - stat.st_mtime > max_age:
+                os.unlink(path)
+            elif not name.startswith('tmp'):
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            # Removed concurrently by another process
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def compute_key_timeline(chroma: np.ndarray, frame_times: np.ndarray, duration: float) -> list:
+    """
+    Estimate the key over consecutive fixed-length windows, merging neighbours
+    that share the same key.
+
+    Args:
+        chroma: Chroma features (12 x frames)
+        frame_times: Time of each chroma frame in seconds
+        duration: Total duration in seconds
+
+    Returns:
+        List of dictionaries with start, end, key and confidence
+    """
+    timeline = []
+
+    for window_start in np.arange(0, duration, KEY_WINDOW):
+        window_end = min(window_start + KEY_WINDOW, duration)
+        mask = (frame_times >= window_start) & (frame_times < window_end)
+        if not np.any(mask):
+            continue
+
+        key, confidence = key_from_chroma(chroma[:, mask])
+
+        if timeline and timeline[-1]['key'] == key:
+            # Extend the previous section, keeping the stronger confidence
+            timeline[-1]['end'] = round(float(window_end), 2)
+            timeline[-1]['confidence'] = max(timeline[-1]['confidence'], round(confidence, 3))
+        else:
+            timeline.append({
+                'start': round(float(window_start), 2),
+                'end': round(float(window_end), 2),
+                'key': key,
+                'confidence': round(confidence, 3)
+            })
+
+    return timeline
+
+
+def preanalyze(audio_path: str) -> dict:
+    """
+    Compute and cache whole-file features for an audio file.
+
+    Args:
+        audio_path: Path to audio file
+
+    Returns:
+        dict with success status, cache path, tempo and key timeline
+    """
+    if not os.path.isfile(audio_path):
+        return {
+            'success': False,
+            'error': f'Audio file not found: {audio_path}'
+        }
+
+    # analyze.py only reads the cache on the librosa path, so don't pay for features it won't use
+    if madmom_available():
+        return {
+            'success': False,
+            'skipped': True,
+            'error': 'Pre-analysis skipped: madmom chord detection needs the raw audio'
+        }
+
+    try:
+        cache_path = feature_cache_path(audio_path)
+
+        # Use the same sample rate as analyze.py so sliced features match
+        y, sr = librosa.load(audio_path, sr=ANALYSIS_SR, mono=True)
+        duration = len(y) / sr
+
+        if len(y) == 0:
+            return {
+                'success': False,
+                'error': 'Audio file is empty'
+            }
+
+        chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=HOP_LENGTH)
+        onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=HOP_LENGTH)
+        tempo, beat_frames = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH)
+        tempo = float(np.atleast_1d(tempo)[0])
+        beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=HOP_LENGTH)
+
+        frame_times = librosa.frames_to_time(np.arange(chroma.shape[1]), sr=sr, hop_length=HOP_LENGTH)
+        key_timeline = compute_key_timeline(chroma, frame_times, duration)
+
+        # Write to a temporary name first so readers never see a partial cache
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        prune_cache()
+        fd, tmp_path = tempfile.mkstemp(suffix='.npz', dir=CACHE_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.array(FEATURES_VERSION),
+                    sr=np.array(sr),
+                    hop_length=np.array(HOP_LENGTH),
+                    duration=np.array(duration),
+                    tempo=np.array(tempo),
+                    chroma=chroma.astype(np.float32),
+                    onset_env=onset_env.astype(np.float32),
+                    beat_times=beat_times,
+                    key_starts=np.array([k['start'] for k in key_timeline]),
+                    key_ends=np.array([k['end'] for k in key_timeline]),
+                    key_names=np.array([k['key'] for k in key_timeline]),
+                    key_confidences=np.array([k['confidence'] for k in key_timeline])
+                )
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return {
+            'success': True,
+            'cachePath': cache_path,
+            'duration': duration,
+            'tempo': round(tempo, 2),
+            'beats': len(beat_times),
+            'keyTimeline': key_timeline
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(json.dumps({
+            'success': False,
+            'error': 'Usage: preanalyze.py <audio_path>'
+        }))
+        sys.exit(1)
+
+    # Exit through SystemExit on cancellation so the temp cache file is cleaned up
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+
+    # Run at the lowest CPU priority so foreground analysis stays responsive
+    try:
+        os.nice(19)
+    except (AttributeError, OSError):
+        pass
+
+    audio_path = sys.argv[1]
+
+    result = preanalyze(audio_path)
+    print(json.dumps(result))
+
+    sys.exit(0 if result['success'] or result.get('skipped') else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Real-time chord and key following from a live audio stream.
+Consumes audio incrementally from a microphone, a raw PCM pipe on stdin, or a
+file played back at real-time rate (for offline testing), and prints chord and
+key updates as JSON lines with measured latency.
+"""
+
+import sys
+import json
+import signal
+import threading
+import queue
+import time
+import warnings
+from collections import deque
+
+# Suppress warnings for cleaner output
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import librosa
+
+from analyze import key_from_chroma, match_chord
+
+SAMPLE_RATE = 22050
+N_FFT = 4096             # ~186 ms analysis window at 22.05 kHz
+HOP = 2048               # ~93 ms between chroma frames (also the input block size)
+CHORD_WINDOW = 1.0       # Seconds of chroma averaged for each chord decision
+CHORD_THRESHOLD = 0.6    # Same template score threshold as analyze.py
+CHORD_HOLD_FRAMES = 2    # Consecutive frames a new chord must win before it is reported
+KEY_HALF_LIFE = 20.0     # Seconds for old chroma to lose half its weight in the key estimate
+KEY_MIN_SECONDS = 5.0    # Seconds of sound needed before the first key update
+SILENCE_RMS = 1e-3       # Frames quieter than this are treated as silence
+MAX_QUEUED_BLOCKS = 8    # Live (microphone) blocks waiting beyond this are dropped to bound latency
+
+
+class RingBuffer:
+    """Fixed-size circular buffer holding the most recent audio samples."""
+
+    def __init__(self, size: int):
+        self.buffer = np.zeros(size, dtype=np.float32)
+        self.size = size
+        self.written = 0  # Total samples ever written
+
+    def write(self, samples: np.ndarray):
+        # Only the newest `size` samples can be kept
+        skipped = len(samples) - self.size
+        if skipped > 0:
+            self.written += skipped
+            samples = samples[skipped:]
+
+        pos = self.written % self.size
+        first = min(len(samples), self.size - pos)
+        self.buffer[pos:pos + first] = samples[:first]
+        self.buffer[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def latest(self, n: int) -> np.ndarray:
+        end = self.written % self.size
+        return self.buffer[np.arange(end - n, end) % self.size]
+
+
+class StreamingAnalyzer:
+    """
+    Incremental chord and key tracker.
+    Each new hop of audio yields one STFT chroma frame; chords come from a short
+    moving average of frames and the key from an exponentially decaying profile.
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE):
+        self.sr = sr
+        self.ring = RingBuffer(N_FFT + 4 * HOP)
+        self.window = np.hanning(N_FFT + 1)[:-1].astype(np.float32)
+        self.chroma_filter = librosa.filters.chroma(sr=sr, n_fft=N_FFT)
+        self.chord_frames = deque(maxlen=max(1, int(round(CHORD_WINDOW * sr / HOP))))
+        self.key_profile = np.zeros(12)
+        self.key_decay = 0.5 ** (HOP / sr / KEY_HALF_LIFE)
+        self.sounding_frames = 0
+        self.next_frame_end = N_FFT
+        self.gaps = 0
+        self.gap_samples = 0
+        self.current_chord = None
+        self.pending_chord = None
+        self.pending_frames = 0
+        self.current_key = None
+
+    def process(self, block: np.ndarray) -> list:
+        """
+        Feed a block of mono float samples.
+
+        Args:
+            block: Audio samples in the range -1..1
+
+        Returns:
+            List of update dictionaries (possibly empty)
+        """
+        self.ring.write(block)
+        updates = []
+
+        while self.ring.written >= self.next_frame_end:
+            frame_end = self.next_frame_end
+            self.next_frame_end += HOP
+
+            # Frames that already left the ring buffer are skipped
+            back = self.ring.written - frame_end
+            if back + N_FFT > self.ring.size:
+                continue
+
+            frame = self.ring.latest(back + N_FFT)[:N_FFT]
+            stream_time = (frame_end + self.gap_samples) / self.sr
+            updates.extend(self._update(self._chroma_frame(frame), stream_time))
+
+        return updates
+
+    def skip(self, samples: int):
+        """
+        Record that audio was dropped before the next block, so update times
+        keep matching the stream position.
+
+        Args:
+            samples: Number of samples missing from the stream
+        """
+        self.gaps += 1
+        self.gap_samples += samples
+
+        # Don't analyze frames spanning the discontinuity
+        self.next_frame_end = self.ring.written + N_FFT
+        self.chord_frames.clear()
+        self.pending_chord = None
+
+    @property
+    def stream_duration(self) -> float:
+        return (self.ring.written + self.gap_samples) / self.sr
+
+    def _chroma_frame(self, frame: np.ndarray):
+        if np.sqrt(np.mean(frame ** 2)) < SILENCE_RMS:
+            return None
+
+        spectrum = np.abs(np.fft.rfft(frame * self.window)) ** 2
+        chroma = self.chroma_filter @ spectrum
+        return chroma / (np.max(chroma) + 1e-10)
+
+    def _update(self, chroma, stream_time: float) -> list:
+        updates = []
+
+        if chroma is None:
+            # Silence: forget the current chord so the next one is reported fresh
+            self.chord_frames.clear()
+            if self.current_chord is not None and self.current_chord != 'N':
+                self.current_chord = 'N'
+                updates.append({'type': 'chord', 'time': round(stream_time, 2), 'chord': 'N', 'score': 0.0})
+            return updates
+
+        self.chord_frames.append(chroma)
+        self.key_profile = self.key_decay * self.key_profile + chroma
+        self.sounding_frames += 1
+
+        # Wait for half a chord window before the first decision
+        if len(self.chord_frames) * 2 >= self.chord_frames.maxlen:
+            chord, score = match_chord(np.mean(self.chord_frames, axis=0))
+            if score <= CHORD_THRESHOLD or chord == self.current_chord:
+                self.pending_chord = None
+            elif chord != self.pending_chord:
+                self.pending_chord = chord
+                self.pending_frames = 1
+            else:
+                self.pending_frames += 1
+
+            # Ignore chords that only win briefly during a transition
+            if self.pending_chord is not None and self.pending_frames >= CHORD_HOLD_FRAMES:
+                self.current_chord = chord
+                self.pending_chord = None
+                updates.append({'type': 'chord', 'time': round(stream_time, 2), 'chord': chord, 'score': round(float(score), 3)})
+
+        if self.sounding_frames * HOP / self.sr >= KEY_MIN_SECONDS:
+            key, confidence = key_from_chroma(self.key_profile[:, np.newaxis])
+            if key != self.current_key:
+                self.current_key = key
+                updates.append({'type': 'key', 'time': round(stream_time, 2), 'key': key, 'confidence': round(float(confidence), 3)})
+
+        return updates
+
+
+def make_item(block: np.ndarray, stats: dict) -> tuple:
+    """Stamp a block with its arrival time and its sample offset in the stream."""
+    offset = stats['inputSamples']
+    stats['inputSamples'] += len(block)
+    return block, time.monotonic(), offset
+
+
+def put_latest(blocks: queue.Queue, item, stats: dict):
+    """
+    Queue an item, dropping the oldest waiting block if the queue is full.
+    Used for live input, which can't be paused, to bound latency.
+    """
+    while True:
+        try:
+            blocks.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                dropped = blocks.get_nowait()
+                if dropped is not None:
+                    stats['droppedBlocks'] += 1
+                    stats['droppedSamples'] += len(dropped[0])
+            except queue.Empty:
+                pass
+
+
+def put_blocking(blocks: queue.Queue, item, stop: threading.Event):
+    """Queue an item, waiting for room so the producer is slowed down instead of losing audio."""
+    while not stop.is_set():
+        try:
+            blocks.put(item, timeout=0.2)
+            return
+        except queue.Full:
+            continue
+
+
+def read_stdin(blocks: queue.Queue, stats: dict, stop: threading.Event):
+    """Read 16-bit little-endian mono PCM from stdin."""
+    stream = sys.stdin.buffer
+    while not stop.is_set():
+        data = stream.read(HOP * 2)
+        if not data:
+            break
+        data = data[:len(data) - len(data) % 2]
+        block = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+        # A pipe applies backpressure, so wait rather than drop
+        put_blocking(blocks, make_item(block, stats), stop)
+    put_blocking(blocks, None, stop)
+
+
+def read_file(y: np.ndarray, sr: int, blocks: queue.Queue, stats: dict, stop: threading.Event):
+    """Deliver a loaded file in blocks at real-time rate, simulating a live input."""
+    t0 = time.monotonic()
+    for start in range(0, len(y), HOP):
+        block = y[start:start + HOP]
+
+        # A block "arrives" when its last sample would have been captured
+        delay = t0 + (start + len(block)) / sr - time.monotonic()
+        if delay > 0 and stop.wait(delay):
+            break
+        put_blocking(blocks, make_item(block, stats), stop)
+    put_blocking(blocks, None, stop)
+
+
+def read_microphone(stream, blocks: queue.Queue, stats: dict, stop: threading.Event):
+    """Run a sounddevice input stream until asked to stop."""
+    with stream:
+        stop.wait()
+    put_latest(blocks, None, stats)
+
+
+def stream_analyze(source: str, sr: int = SAMPLE_RATE, emit=None) -> dict:
+    """
+    Follow chords and key on a live audio stream.
+
+    Args:
+        source: '-' for raw PCM on stdin, 'mic' for the default microphone,
+            or a path to an audio file to play back at real-time rate
+        sr: Sample rate of the stream
+        emit: Callback receiving each update dictionary as it is produced
+
+    Returns:
+        dict with success status and latency statistics
+    """
+    blocks = queue.Queue(maxsize=MAX_QUEUED_BLOCKS)
+    stats = {'inputSamples': 0, 'droppedBlocks': 0, 'droppedSamples': 0}
+    stop = threading.Event()
+
+    try:
+        if source == '-':
+            reader = threading.Thread(target=read_stdin, args=(blocks, stats, stop), daemon=True)
+        elif source == 'mic':
+            try:
+                import sounddevice as sd
+            except ImportError:
+                return {
+                    'success': False,
+                    'error': 'Microphone input requires sounddevice: pip install sounddevice'
+                }
+
+            def callback(indata, frames, time_info, status):
+                put_latest(blocks, make_item(indata[:, 0].copy(), stats), stats)
+
+            stream = sd.InputStream(samplerate=sr, channels=1, dtype='float32', blocksize=HOP, callback=callback)
+            reader = threading.Thread(target=read_microphone, args=(stream, blocks, stats, stop), daemon=True)
+        else:
+            y, _ = librosa.load(source, sr=sr, mono=True)
+            reader = threading.Thread(target=read_file, args=(y, sr, blocks, stats, stop), daemon=True)
+
+        analyzer = StreamingAnalyzer(sr)
+        latencies = []
+
+        # Stop cleanly (and still report statistics) when terminated
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+        reader.start()
+        try:
+            while not stop.is_set():
+                try:
+                    item = blocks.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+
+                block, arrival, offset = item
+
+                # Blocks dropped in between leave a gap in the stream
+                expected = analyzer.ring.written + analyzer.gap_samples
+                if offset > expected:
+                    analyzer.skip(offset - expected)
+
+                updates = analyzer.process(block)
+
+                # Latency from the block's arrival to its updates being ready
+                latency_ms = (time.monotonic() - arrival) * 1000
+                latencies.append(latency_ms)
+
+                if emit:
+                    for update in updates:
+                        update['latencyMs'] = round(latency_ms, 1)
+                        emit(update)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+
+        return {
+            'success': True,
+            'duration': round(analyzer.stream_duration, 2),
+            'blocks': len(latencies),
+            'droppedBlocks': stats['droppedBlocks'],
+            # Latency figures only cover kept blocks; this shows how much audio was lost
+            'droppedFraction': round(stats['droppedSamples'] / stats['inputSamples'], 4) if stats['inputSamples'] else 0.0,
+            'gaps': analyzer.gaps,
+            # Inherent delay from the analysis window, independent of processing speed
+            'windowLatencyMs': round((N_FFT / sr + CHORD_WINDOW / 2) * 1000, 1),
+            'latencyMs': {
+                'mean': round(float(np.mean(latencies)), 2) if latencies else 0.0,
+                'p95': round(float(np.percentile(latencies, 95)), 2) if latencies else 0.0,
+                'max': round(float(np.max(latencies)), 2) if latencies else 0.0
+            }
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(json.dumps({
+            'type': 'summary',
+            'success': False,
+            'error': 'Usage: stream_analyze.py <audio_path | - | mic> [sample_rate]'
+        }))
+        sys.exit(1)
+
+    source = sys.argv[1]
+    sr = int(sys.argv[2]) if len(sys.argv) > 2 else SAMPLE_RATE
+
+    def emit(update):
+        print(json.dumps(update), flush=True)
+
+    result = stream_analyze(source, sr, emit)
+    print(json.dumps({'type': 'summary', **result}), flush=True)
+
+    sys.exit(0 if result['success'] else 1)
+
+
+if __name__ == '__main__':
+    main()
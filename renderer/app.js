@@ -4,6 +4,18 @@ const fileInput = document.getElementById('fileInput');
 const youtubeSection = document.getElementById('youtubeSection');
 const youtubeUrl = document.getElementById('youtubeUrl');
 const youtubeLoadBtn = document.getElementById('youtubeLoadBtn');
+const liveSection = document.getElementById('liveSection');
+const liveBtn = document.getElementById('liveBtn');
+const liveBtnText = document.getElementById('liveBtnText');
+const livePanel = document.getElementById('livePanel');
+const liveChord = document.getElementById('liveChord');
+const liveKey = document.getElementById('liveKey');
+const liveLatency = document.getElementById('liveLatency');
+const importSection = document.getElementById('importSection');
+const importBtn = document.getElementById('importBtn');
+const importBtnText = document.getElementById('importBtnText');
+const importStatus = document.getElementById('importStatus');
+const importList = document.getElementById('importList');
 const waveformSection = document.getElementById('waveformSection');
 const fileName = document.getElementById('fileName');
 const clearFile = document.getElementById('clearFile');
@@ -20,6 +32,7 @@ const presetButtons = document.querySelectorAll('.btn-preset');
 const granularitySlider = document.getElementById('granularitySlider');
 const granularityValue = document.getElementById('granularityValue');
 const analyzeBtn = document.getElementById('analyzeBtn');
+const preanalyzeToggle = document.getElementById('preanalyzeToggle');
 const loadingOverlay = document.getElementById('loadingOverlay');
 const loadingText = document.getElementById('loadingText');
 const resultsSection = document.getElementById('resultsSection');
@@ -39,6 +52,10 @@ let currentChords = []; // Store chords for playback highlighting
 let chordElements = []; // Store chord DOM elements
 let chordCarousel = null; // Store carousel element for scrolling
 let lastActiveChordIndex = -1; // Track last active chord for debug logging
+let liveRunning = false; // Live microphone chord following in progress
+let ingestRunning = false; // Folder import in progress
+const importItems = new Map(); // Imported input path -> list item element
+let preanalyzeOnLoad = localStorage.getItem('preanalyzeOnLoad') !== 'false'; // Precompute whole-file features in the background after loading
 
 // Carousel drag state
 let isDragging = false;
@@ -579,8 +596,9 @@ function hideLoading() {
   loadingOverlay.classList.add('hidden');
 }
 
-// Load audio file
-async function loadFile(filePath) {
+// Load audio file (displayName overrides the file name shown, e.g. for imported files)
+async function loadFile(filePath, displayName = null) {
+  stopLiveAnalysis();
   originalFilePath = filePath;
   showLoading('Loading file...');
 
@@ -614,10 +632,13 @@ async function loadFile(filePath) {
     // Show waveform section, hide drop zone and youtube section
     dropZone.classList.add('hidden');
     youtubeSection.classList.add('hidden');
+    liveSection.classList.add('hidden');
+    importSection.classList.add('hidden');
     waveformSection.classList.remove('hidden');
-    fileName.textContent = filePath.split('/').pop();
+    fileName.textContent = displayName || filePath.split('/').pop();
 
     hideLoading();
+    startPreanalysis(currentAudioPath);
   } catch (error) {
     hideLoading();
     alert(`Error loading file: ${error.message}`);
@@ -632,6 +653,7 @@ async function loadFromYouTube(url) {
     return;
   }
 
+  stopLiveAnalysis();
   showLoading('Downloading audio from YouTube...');
 
   try {
@@ -662,6 +684,8 @@ async function loadFromYouTube(url) {
     // Show waveform section, hide drop zone and youtube section
     dropZone.classList.add('hidden');
     youtubeSection.classList.add('hidden');
+    liveSection.classList.add('hidden');
+    importSection.classList.add('hidden');
     waveformSection.classList.remove('hidden');
     fileName.textContent = result.title || 'YouTube Audio';
     console.log('UI updated, waveformSection visible:', !waveformSection.classList.contains('hidden'));
@@ -671,17 +695,157 @@ async function loadFromYouTube(url) {
 
     hideLoading();
     console.log('Loading hidden');
+    startPreanalysis(currentAudioPath);
   } catch (error) {
     hideLoading();
     // Restore UI on error
     dropZone.classList.remove('hidden');
     youtubeSection.classList.remove('hidden');
+    liveSection.classList.remove('hidden');
+    importSection.classList.remove('hidden');
     waveformSection.classList.add('hidden');
     alert(`Error loading from YouTube: ${error.message}`);
     console.error(error);
   }
 }
 
+// Show a live chord/key update from the microphone
+function showLiveUpdate(update) {
+  if (update.type === 'chord') {
+    liveChord.textContent = update.chord === 'N' ? '–' : update.chord;
+  } else if (update.type === 'key') {
+    liveKey.textContent = `Key: ${update.key}`;
+  }
+  liveLatency.textContent = `${update.latencyMs} ms`;
+}
+
+// Follow chords and key live from the microphone until stopped
+async function startLiveAnalysis() {
+  liveRunning = true;
+  liveBtn.classList.add('active');
+  liveBtnText.textContent = 'Stop';
+  liveChord.textContent = '–';
+  liveKey.textContent = 'Key: –';
+  liveLatency.textContent = 'Listening...';
+  livePanel.classList.remove('hidden');
+
+  const unsubscribe = window.electronAPI.onLiveAnalysisUpdate(showLiveUpdate);
+
+  try {
+    const summary = await window.electronAPI.startLiveAnalysis();
+    liveLatency.textContent = `avg ${summary.latencyMs.mean} ms, ${Math.round(summary.droppedFraction * 100)}% dropped`;
+  } catch (error) {
+    livePanel.classList.add('hidden');
+    alert(`Live listening failed: ${error.message}`);
+    console.error(error);
+  } finally {
+    unsubscribe();
+    liveRunning = false;
+    liveBtn.classList.remove('active');
+    liveBtnText.textContent = 'Listen Live';
+  }
+}
+
+// Stop live listening if it is running
+function stopLiveAnalysis() {
+  if (liveRunning) {
+    window.electronAPI.stopLiveAnalysis();
+  }
+}
+
+// Get (or create) the import list row for an input file
+function getImportItem(input) {
+  let item = importItems.get(input);
+  if (!item) {
+    item = document.createElement('li');
+    item.className = 'import-item';
+
+    const name = document.createElement('span');
+    name.className = 'import-item-name';
+    name.textContent = input.split('/').pop();
+    name.title = input;
+
+    const status = document.createElement('span');
+    status.className = 'import-item-status';
+    status.textContent = 'Waiting';
+
+    item.append(name, status);
+    item.addEventListener('click', () => {
+      if (item.dataset.audioPath) {
+        loadFile(item.dataset.audioPath, name.textContent);
+      }
+    });
+
+    importList.appendChild(item);
+    importItems.set(input, item);
+  }
+  return item;
+}
+
+// Show a per-file import event
+function showIngestProgress(update) {
+  const item = getImportItem(update.input);
+  const status = item.querySelector('.import-item-status');
+
+  switch (update.type) {
+    case 'start':
+      status.textContent = 'Converting...';
+      break;
+    case 'progress':
+      status.textContent = `${update.percent}% (${update.realtimeFactor}x)`;
+      break;
+    case 'done':
+    case 'skipped':
+      status.textContent = update.type === 'done' ? 'Ready' : 'Ready (already imported)';
+      item.dataset.audioPath = update.audioPath;
+      item.classList.add('ready');
+      break;
+    case 'error':
+      status.textContent = 'Failed';
+      item.title = update.error || '';
+      item.classList.add('failed');
+      break;
+    case 'cancelled':
+      status.textContent = 'Cancelled';
+      break;
+  }
+}
+
+// Import many files/folders; click a finished row to load it
+async function importFiles() {
+  const paths = await window.electronAPI.openImportDialog();
+  if (!paths) return;
+
+  stopLiveAnalysis();
+  ingestRunning = true;
+  importBtnText.textContent = 'Cancel Import';
+  importStatus.textContent = 'Importing...';
+  importList.innerHTML = '';
+  importItems.clear();
+  importList.classList.remove('hidden');
+
+  const unsubscribe = window.electronAPI.onIngestProgress(showIngestProgress);
+
+  try {
+    const summary = await window.electronAPI.ingestFiles(paths);
+    summary.results.forEach((result) => showIngestProgress({ type: result.status, ...result }));
+
+    const parts = [`${summary.done} imported`];
+    if (summary.skipped) parts.push(`${summary.skipped} already imported`);
+    if (summary.failed) parts.push(`${summary.failed} failed`);
+    if (summary.cancelled) parts.push(`${summary.cancelled} cancelled`);
+    importStatus.textContent = `${parts.join(', ')} - ${summary.filesPerMinute} files/min, ${summary.mbPerSecond} MB/s`;
+  } catch (error) {
+    importStatus.textContent = '';
+    alert(`Import failed: ${error.message}`);
+    console.error(error);
+  } finally {
+    unsubscribe();
+    ingestRunning = false;
+    importBtnText.textContent = 'Import Folder...';
+  }
+}
+
 // Get granularity settings based on slider value
 function getGranularityInfo(sliderValue, beatsPerMeasure) {
   // Slider values 1-5 map to different groupings
@@ -702,6 +866,21 @@ function updateGranularityLabel() {
   granularityValue.textContent = info.label;
 }
 
+// Start background whole-file pre-analysis so later segment analysis is instant
+function startPreanalysis(audioPath) {
+  if (!preanalyzeOnLoad) return;
+
+  window.electronAPI.startPreanalysis(audioPath).then((result) => {
+    if (result.success) {
+      console.log('Pre-analysis complete:', result.tempo, 'BPM,', result.keyTimeline.length, 'key sections');
+    } else if (result.skipped) {
+      console.log(result.error);
+    } else if (!result.cancelled) {
+      console.warn('Pre-analysis failed:', result.error);
+    }
+  });
+}
+
 // Analyze selected segment
 async function analyzeSegment() {
   if (!currentRegion || !currentAudioPath) return;
@@ -826,6 +1005,7 @@ function clearCurrentFile() {
     wavesurfer = null;
   }
   cleanupCarouselDrag();
+  window.electronAPI.cancelPreanalysis();
   currentRegion = null;
   currentAudioPath = null;
   originalFilePath = null;
@@ -840,6 +1020,8 @@ function clearCurrentFile() {
   resultsSection.classList.add('hidden');
   dropZone.classList.remove('hidden');
   youtubeSection.classList.remove('hidden');
+  liveSection.classList.remove('hidden');
+  importSection.classList.remove('hidden');
   analyzeBtn.disabled = true;
 
   currentTimeEl.textContent = '0:00';
@@ -894,6 +1076,24 @@ playPause.addEventListener('click', () => {
 // Analyze button
 analyzeBtn.addEventListener('click', analyzeSegment);
 
+// Import button - starts an import, or cancels the running one
+importBtn.addEventListener('click', () => {
+  if (ingestRunning) {
+    window.electronAPI.cancelIngest();
+  } else {
+    importFiles();
+  }
+});
+
+// Live listening button
+liveBtn.addEventListener('click', () => {
+  if (liveRunning) {
+    stopLiveAnalysis();
+  } else {
+    startLiveAnalysis();
+  }
+});
+
 // Clear file button
 clearFile.addEventListener('click', clearCurrentFile);
 
@@ -931,9 +1131,24 @@ timeSignatureSelect.addEventListener('change', () => {
 // Granularity slider
 granularitySlider.addEventListener('input', updateGranularityLabel);
 
+// Pre-analysis toggle - remembered between sessions
+preanalyzeToggle.addEventListener('change', () => {
+  preanalyzeOnLoad = preanalyzeToggle.checked;
+  localStorage.setItem('preanalyzeOnLoad', preanalyzeOnLoad);
+
+  if (!preanalyzeOnLoad) {
+    window.electronAPI.cancelPreanalysis();
+  } else if (currentAudioPath) {
+    startPreanalysis(currentAudioPath);
+  }
+});
+
 // Initialize granularity label
 updateGranularityLabel();
 
+// Initialize pre-analysis toggle
+preanalyzeToggle.checked = preanalyzeOnLoad;
+
 // Keyboard shortcuts
 document.addEventListener('keydown', (e) => {
   // Don't trigger space shortcut when typing in input fields